@@ -468,9 +468,14 @@ def router_node(state: AgentState) -> dict:
     return {"selected_tool": tool_choice}
 
 
-def tool_executor_node(state: AgentState) -> dict:
+async def tool_executor_node(state: AgentState) -> dict:
     """
     Tool executor node: Runs the selected tool with extracted parameters.
+    
+    Runs on the app's event loop (the graph is driven by ainvoke). Tools
+    with a native coroutine (link_price_news) are awaited there, so they
+    share the loop-bound HTTP session; sync-only tools are
+    run in a worker thread by ainvoke.
     """
     tool_name = state["selected_tool"]
     query = state["current_query"]
@@ -480,11 +485,11 @@ def tool_executor_node(state: AgentState) -> dict:
     
     # Execute the appropriate tool
     if tool_name == "earnings":
-        result = get_earnings_summary.invoke(params)
+        result = await get_earnings_summary.ainvoke(params)
     elif tool_name == "comparison":
-        result = compare_financial_data.invoke(params)
+        result = await compare_financial_data.ainvoke(params)
     elif tool_name == "price_news":
-        result = link_price_news.invoke(params)
+        result = await link_price_news.ainvoke(params)
     else:
         # Fallback
         result = ToolResult(
@@ -4,11 +4,13 @@
 from typing import TypedDict, Annotated, Sequence, Optional, Literal
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Citation(BaseModel):
     """Verified source reference."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     id: int = Field(description="Sequential citation number")
     source_type: str = Field(description="Type: '10-Q', 'News Article', 'SEC Form 4', 'Metric API'")
     source_detail: str = Field(description="Specific source information")
@@ -16,6 +18,8 @@ class Citation(BaseModel):
 
 class Metric(BaseModel):
     """Structured metric for rendering."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     key: str = Field(description="Metric name")
     value: str = Field(description="Metric value")
     color_context: Optional[Literal["red", "green", "blue", "yellow"]] = None
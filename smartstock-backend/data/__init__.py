@@ -5,6 +5,7 @@
 from data.vector_store import VectorStore, get_vector_store
 from data.metrics_store import MetricsStore, get_metrics_store
 from data.news_store import NewsStore, get_news_store
+from data.prompt_cache import SemanticPromptCache, get_prompt_cache
 
 # Document processing
 from data.document_loader import SECDocumentLoader, DemoDocumentLoader, Document
@@ -40,6 +41,10 @@ __all__ = [
     "NewsStore",
     "get_news_store",
     
+    # Prompt Cache
+    "SemanticPromptCache",
+    "get_prompt_cache",
+    
     # Document Loading
     "SECDocumentLoader",
     "DemoDocumentLoader",
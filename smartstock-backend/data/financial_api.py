@@ -6,6 +6,8 @@
 import os
 import aiohttp
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
@@ -22,6 +24,95 @@ except ImportError:
 
 load_dotenv()
 
+# Blocking Finnhub SDK calls run on their own threads, never the loop's default
+# executor: run_fetch callers already occupy default-executor threads while
+# they wait, so sharing that pool could deadlock under load
+_FINNHUB_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="finnhub-sdk")
+
+# Upper bound for a run_fetch call waiting on the app loop
+RUN_FETCH_TIMEOUT = 120  # seconds
+
+# Shared keep-alive HTTP session for the app's event loop (see init_http_session)
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def init_http_session(limit: int = 20, limit_per_host: int = 10):
+    """
+    Create the shared aiohttp session on the running event loop.
+    
+    Requests made on this loop reuse pooled keep-alive connections instead
+    of opening a new session (and TCP/TLS handshake) per call. Async tools
+    (link_price_news) run on this loop directly; sync tools submit their
+    fetches to it with run_fetch. Requests on other loops (scripts) keep
+    using a short-lived session, since aiohttp sessions cannot cross loops.
+    
+    Args:
+        limit: Maximum total connections in the pool (default: 20)
+        limit_per_host: Maximum connections per provider host (default: 10)
+    """
+    global _http_session, _http_session_loop
+    
+    if _http_session is not None:
+        return
+    
+    _http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host, keepalive_timeout=30)
+    )
+    _http_session_loop = asyncio.get_running_loop()
+    print(f"[FinancialDataFetcher] Shared HTTP session initialized: {limit} connections")
+
+
+def get_http_session() -> Optional[aiohttp.ClientSession]:
+    """Get the shared aiohttp session if it belongs to the running event loop."""
+    if _http_session is None:
+        return None
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return _http_session if loop is _http_session_loop else None
+
+
+def run_fetch(coro, timeout: float = RUN_FETCH_TIMEOUT):
+    """
+    Run a fetcher coroutine from sync code and return its result.
+    
+    From a worker thread while the app loop owns the shared session, the
+    coroutine is submitted to that loop so its requests reuse the pooled
+    connections; otherwise (scripts, no app running) it runs under
+    asyncio.run as before.
+    
+    Raises:
+        concurrent.futures.TimeoutError: The coroutine did not finish on the
+            app loop within timeout seconds (it is cancelled)
+    """
+    loop = _http_session_loop
+    if loop is not None and loop.is_running():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not loop:
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+            try:
+                return future.result(timeout=timeout)
+            except Exception:
+                future.cancel()
+                raise
+    return asyncio.run(coro)
+
+
+async def close_http_session():
+    """Close the shared aiohttp session. Call this on application shutdown."""
+    global _http_session, _http_session_loop
+    
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+        _http_session_loop = None
+        print("[FinancialDataFetcher] Shared HTTP session closed")
+
 
 class DataProvider(Enum):
     """Supported financial data providers."""
@@ -213,20 +304,21 @@ class FinancialDataFetcher:
         - Fewer retries (2) to avoid long stalls when the provider is degraded.
         """
         timeout_obj = aiohttp.ClientTimeout(total=timeout, connect=10)
+        shared_session = get_http_session()
         for attempt in range(retries):
+            session = shared_session if shared_session is not None else aiohttp.ClientSession(timeout=timeout_obj)
             try:
-                async with aiohttp.ClientSession(timeout=timeout_obj) as session:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            return await response.json()
-                        elif response.status == 429:
-                            wait_time = 5 * (attempt + 1)
-                            print(f"[FinancialDataFetcher] Rate limited (429). Waiting {wait_time}s... (Attempt {attempt+1}/{retries})")
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            print(f"[FinancialDataFetcher] API error: {response.status} for {url}")
-                            return None
+                async with session.get(url, params=params, timeout=timeout_obj) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    elif response.status == 429:
+                        wait_time = 5 * (attempt + 1)
+                        print(f"[FinancialDataFetcher] Rate limited (429). Waiting {wait_time}s... (Attempt {attempt+1}/{retries})")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    else:
+                        print(f"[FinancialDataFetcher] API error: {response.status} for {url}")
+                        return None
             except asyncio.TimeoutError:
                 print(f"[FinancialDataFetcher] Timeout after {timeout}s for {url} (Attempt {attempt+1}/{retries})")
                 if attempt < retries - 1:
@@ -245,8 +337,16 @@ class FinancialDataFetcher:
                     await asyncio.sleep(1)
                     continue
                 return None
+            finally:
+                if session is not shared_session:
+                    await session.close()
         return None
     
+    async def _finnhub_call(self, fn, *args):
+        """Run a blocking Finnhub SDK call on the dedicated Finnhub executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_FINNHUB_EXECUTOR, functools.partial(fn, *args))
+    
     def __init__(
         self,
         finnhub_key: Optional[str] = None,
@@ -334,8 +434,9 @@ class FinancialDataFetcher:
             start_ts = int(start_date.timestamp())
             end_ts = int(end_date.timestamp())
             
-            # Fetch candle data (OHLCV)
-            data = self.finnhub_client.stock_candles(
+            # Fetch candle data (OHLCV); the SDK is blocking, keep it off the loop
+            data = await self._finnhub_call(
+                self.finnhub_client.stock_candles,
                 ticker.upper(),
                 'D',  # Daily resolution
                 start_ts,
@@ -487,7 +588,7 @@ class FinancialDataFetcher:
         
         try:
             # Get basic financials
-            data = self.finnhub_client.company_basic_financials(ticker.upper(), 'all')
+            data = await self._finnhub_call(self.finnhub_client.company_basic_financials, ticker.upper(), 'all')
             
             if not data or 'metric' not in data:
                 print(f"[FinancialDataFetcher] Finnhub: No financials for {ticker}")
@@ -556,7 +657,8 @@ class FinancialDataFetcher:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            news = self.finnhub_client.company_news(
+            news = await self._finnhub_call(
+                self.finnhub_client.company_news,
                 ticker.upper(),
                 start_date.strftime("%Y-%m-%d"),
                 end_date.strftime("%Y-%m-%d")
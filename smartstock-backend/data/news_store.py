@@ -3,10 +3,118 @@
 # Stores news articles for retention policy enforcement and archival
 
 import json
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+import asyncio
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
 from data.db_connection import get_connection
 
+_EPOCH = datetime(1970, 1, 1)
+_ONE_DAY = timedelta(days=1)
+
+
+def epoch_day(ts: datetime) -> int:
+    """
+    Day bin for a timestamp, matching the published_day generated column.
+    
+    Naive datetimes are treated as UTC, as PostgreSQL does for
+    EXTRACT(EPOCH FROM timestamp).
+    """
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH) // _ONE_DAY
+
+
+# Bulk ±24hr windows query (see NewsStore.get_news_in_temporal_windows_bulk)
+_WINDOWS_BULK_SQL = """
+    WITH hits AS (
+        SELECT w.idx, n.id
+        FROM unnest(%s::timestamp[], %s::timestamp[], %s::int[], %s::int[])
+             WITH ORDINALITY AS w(window_start, window_end, start_day, end_day, idx)
+        CROSS JOIN LATERAL (
+            SELECT a.id FROM news_articles a
+            WHERE a.ticker = %s
+            AND a.published_day BETWEEN w.start_day AND w.end_day
+            AND a.published_at >= w.window_start
+            AND a.published_at < w.window_end
+            ORDER BY a.published_at ASC
+            LIMIT %s
+        ) n
+    ),
+    articles AS (
+        SELECT a.*,
+               CASE
+                   WHEN jsonb_typeof(a.metadata -> 'sentiment') = 'number'
+                       THEN (a.metadata ->> 'sentiment')::float8
+                   WHEN a.metadata -> 'sentiment' IS NULL THEN 0
+               END AS sentiment,
+               array_agg(h.idx ORDER BY h.idx) AS window_idxs
+        FROM hits h
+        JOIN news_articles a ON a.id = h.id
+        GROUP BY a.id
+    )
+    SELECT articles.*,
+           AVG(sentiment) OVER () AS agg_average_score,
+           COUNT(sentiment) OVER () AS agg_total_articles,
+           COUNT(*) FILTER (WHERE sentiment > 0.2) OVER () AS agg_positive_count,
+           COUNT(*) FILTER (WHERE sentiment < -0.2) OVER () AS agg_negative_count,
+           COUNT(*) FILTER (WHERE sentiment BETWEEN -0.2 AND 0.2) OVER () AS agg_neutral_count
+    FROM articles
+    ORDER BY published_at ASC, id ASC
+"""
+
+
+def _window_params(
+    ticker: str,
+    windows: List[Tuple[datetime, datetime]],
+    limit_per_window: int
+) -> tuple:
+    """Query parameters for _WINDOWS_BULK_SQL, in placeholder order."""
+    return (
+        [w[0] for w in windows],
+        [w[1] for w in windows],
+        [epoch_day(w[0]) for w in windows],
+        [epoch_day(w[1]) for w in windows],
+        ticker.upper(),
+        limit_per_window
+    )
+
+
+def _group_window_rows(
+    rows: List[Dict[str, Any]],
+    n_windows: int
+) -> Tuple[List[List[Dict[str, Any]]], Dict[str, Any]]:
+    """Split bulk-window rows into per-window article lists and sentiment totals."""
+    grouped: List[List[Dict[str, Any]]] = [[] for _ in range(n_windows)]
+    totals: Dict[str, Any] = {
+        "average_score": 0.0,
+        "positive_count": 0,
+        "negative_count": 0,
+        "neutral_count": 0,
+        "total_articles": 0
+    }
+    
+    # Window aggregates are identical on every row; read them once
+    if rows:
+        for column, value in rows[0].items():
+            if column.startswith("agg_") and value is not None:
+                totals[column[len("agg_"):]] = value
+    
+    for row_dict in rows:
+        window_idxs = row_dict.pop("window_idxs")
+        for column in [c for c in row_dict if c.startswith("agg_")]:
+            row_dict.pop(column)
+        # Parse JSONB metadata back to dict if present
+        if row_dict.get("metadata") and isinstance(row_dict["metadata"], str):
+            try:
+                row_dict["metadata"] = json.loads(row_dict["metadata"])
+            except (json.JSONDecodeError, TypeError):
+                pass
+        # Rows arrive in published_at order, so each window stays sorted
+        for window_idx in window_idxs:
+            grouped[window_idx - 1].append(row_dict)
+    
+    return grouped, totals
+
 
 class NewsStore:
     """
@@ -37,9 +145,14 @@ class NewsStore:
                     published_at TIMESTAMP NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     chroma_id VARCHAR(255),
-                    metadata JSONB
+                    metadata JSONB,
+                    published_day INTEGER
+                        GENERATED ALWAYS AS (floor(EXTRACT(EPOCH FROM published_at) / 86400)::int) STORED
                 )
             """)
+            # idx_news_ticker_day_id (and published_day on tables created before it
+            # existed) come from migrations/add_news_published_day.sql, since adding
+            # the column rewrites the table
             
             # Unique constraint on URL (only for non-NULL URLs)
             cursor.execute("""
@@ -231,11 +344,15 @@ class NewsStore:
         """
         Get news articles within a specific temporal window (e.g., ±24 hours).
         
+        The window is semi-open: window_start <= published_at < window_end.
+        
         This enables STRICT temporal RAG by querying PostgreSQL with precise
         timestamp ranges, ensuring only news within the exact window is returned.
         
-        Optimized query that uses composite index (ticker, published_at) for
-        maximum performance on ±24hr temporal queries.
+        The published_day bin predicate lets the planner use the
+        (ticker, published_day, published_at) index; the published_at bounds
+        trim the boundary bins. Matching ids are selected from that index
+        before any full row is read.
         
         Args:
             ticker: Stock ticker symbol
@@ -248,17 +365,29 @@ class NewsStore:
         """
         with get_connection() as conn:
             cursor = conn.cursor()
-            # Query optimized to use composite index (ticker, published_at)
-            # Filter by ticker first (leftmost column in composite index)
-            # Then filter by date range (rightmost column in composite index)
+            # Two stages: pick the ids inside the window from the
+            # (ticker, published_day, published_at) index alone (bin range
+            # first, then the exact semi-open [start, end) bounds), and only
+            # then fetch the full rows for those ids. MATERIALIZED stops the
+            # planner from folding the CTE back into a heap scan.
             cursor.execute("""
-                SELECT * FROM news_articles
-                WHERE ticker = %s 
-                AND published_at >= %s 
-                AND published_at <= %s
-                ORDER BY published_at ASC
-                LIMIT %s
-            """, (ticker.upper(), window_start, window_end, limit))
+                WITH hits AS MATERIALIZED (
+                    SELECT id, published_at FROM news_articles
+                    WHERE ticker = %s 
+                    AND published_day BETWEEN %s AND %s
+                    AND published_at >= %s 
+                    AND published_at < %s
+                    ORDER BY published_at ASC
+                    LIMIT %s
+                )
+                SELECT a.* FROM hits
+                JOIN news_articles a ON a.id = hits.id
+                ORDER BY hits.published_at ASC
+            """, (
+                ticker.upper(),
+                epoch_day(window_start), epoch_day(window_end),
+                window_start, window_end, limit
+            ))
             
             columns = [desc[0] for desc in cursor.description]
             results = []
@@ -273,6 +402,69 @@ class NewsStore:
                 results.append(row_dict)
             return results
     
+    def get_news_in_temporal_windows_bulk(
+        self,
+        ticker: str,
+        windows: List[Tuple[datetime, datetime]],
+        limit_per_window: int = 50
+    ) -> Tuple[List[List[Dict[str, Any]]], Dict[str, Any]]:
+        """
+        Get news articles for several temporal windows in a single query.
+        
+        Equivalent to calling get_news_in_temporal_window once per window,
+        but the windows are passed as arrays and expanded server-side with
+        unnest ... WITH ORDINALITY, so there is one planner pass and one
+        network round-trip. Each window is a semi-open [start, end) LATERAL
+        lookup pruned by its published_day bins, keeping the
+        (ticker, published_day, published_at) index eligible and the
+        per-window LIMIT intact.
+        
+        When windows overlap (volatile days within 48h of each other), an
+        article in the intersection is sent once with the list of windows it
+        falls in (window_idxs), not once per window, and is counted once in
+        the sentiment totals. Windows share that row dict; treat it as read-only.
+        
+        Each article carries a numeric "sentiment" read from metadata (0 when
+        absent, None when not a number). Sentiment totals over the distinct
+        articles are computed in the same pass with window aggregates.
+        
+        Args:
+            ticker: Stock ticker symbol
+            windows: List of (window_start, window_end) tuples
+            limit_per_window: Maximum number of results per window
+            
+        Returns:
+            Tuple of (one list of news articles per window, in the same order
+            as windows; sentiment totals with average_score, positive_count,
+            negative_count, neutral_count and total_articles)
+        """
+        if not windows:
+            return _group_window_rows([], 0)
+        
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_WINDOWS_BULK_SQL, _window_params(ticker, windows, limit_per_window))
+            columns = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        return _group_window_rows(rows, len(windows))
+    
+    async def aget_news_in_temporal_windows_bulk(
+        self,
+        ticker: str,
+        windows: List[Tuple[datetime, datetime]],
+        limit_per_window: int = 50
+    ) -> Tuple[List[List[Dict[str, Any]]], Dict[str, Any]]:
+        """
+        Async variant of get_news_in_temporal_windows_bulk.
+        
+        Runs the psycopg2 query in a worker thread so the event loop is not
+        blocked while PostgreSQL answers.
+        """
+        return await asyncio.to_thread(
+            self.get_news_in_temporal_windows_bulk, ticker, windows, limit_per_window
+        )
+    
     def get_news_for_archival(
         self,
         retention_days: int = 30
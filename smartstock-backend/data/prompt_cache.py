@@ -0,0 +1,139 @@
+# data/prompt_cache.py
+# Semantic Cache for LLM Synthesis Responses
+# Skips the model call when a near-identical prompt was answered recently
+
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    """One cached response with the embedding of the prompt that produced it."""
+    partition: Hashable
+    embedding: np.ndarray
+    response: str
+    created_at: float
+
+
+class SemanticPromptCache:
+    """
+    In-memory proximity cache for LLM responses.
+    
+    Entries are grouped by an exact partition key (e.g. ticker, date range,
+    threshold) and matched within a partition by cosine similarity of
+    unit-normalized prompt embeddings: a single pass over the candidates,
+    one matrix-vector product, hit when the best score reaches the
+    threshold. Entries expire after ttl_seconds and the least recently used
+    entry is evicted once capacity is reached.
+    """
+    
+    def __init__(
+        self,
+        capacity: int = 512,
+        threshold: float = 0.92,
+        ttl_seconds: float = 30 * 60
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            capacity: Maximum number of cached responses
+            threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Age after which an entry is no longer served
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()  # LRU order
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    def _evict_expired(self, now: float) -> None:
+        """Drop entries older than the TTL (caller holds the lock)."""
+        expired = [
+            entry_id for entry_id, entry in self._entries.items()
+            if now - entry.created_at > self.ttl_seconds
+        ]
+        for entry_id in expired:
+            del self._entries[entry_id]
+    
+    def lookup(self, partition: Hashable, embedding: np.ndarray) -> Optional[str]:
+        """
+        Return a cached response for a similar prompt in the same partition.
+        
+        Args:
+            partition: Exact-match key the prompt belongs to
+            embedding: Unit-normalized embedding of the prompt
+        
+        Returns:
+            The cached response, or None on a miss
+        """
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            candidates = [
+                (entry_id, entry) for entry_id, entry in self._entries.items()
+                if entry.partition == partition
+            ]
+            if not candidates:
+                return None
+            
+            scores = np.stack([entry.embedding for _, entry in candidates]) @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            
+            entry_id, entry = candidates[best]
+            self._entries.move_to_end(entry_id)
+            return entry.response
+    
+    def insert(self, partition: Hashable, embedding: np.ndarray, response: str) -> None:
+        """
+        Cache a response for a prompt.
+        
+        Args:
+            partition: Exact-match key the prompt belongs to
+            embedding: Unit-normalized embedding of the prompt
+            response: The LLM response text
+        """
+        with self._lock:
+            self._entries[self._next_id] = _CacheEntry(
+                partition=partition,
+                embedding=embedding,
+                response=response,
+                created_at=time.monotonic()
+            )
+            self._next_id += 1
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+# Singleton instance
+_prompt_cache: Optional[SemanticPromptCache] = None
+
+
+def get_prompt_cache() -> SemanticPromptCache:
+    """Get or create the singleton SemanticPromptCache instance."""
+    global _prompt_cache
+    if _prompt_cache is None:
+        _prompt_cache = SemanticPromptCache()
+    return _prompt_cache
@@ -3,7 +3,9 @@
 # Provides clean SEC filing data for RAG indexing
 
 import os
-from typing import Optional, Dict, Any, List
+import time
+import asyncio
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 from dotenv import load_dotenv
@@ -77,9 +79,14 @@ class SECApiClient:
         ("Part II, Item 1A", "Risk Factors"),
     ]
     
+    # How long extracted sections stay in the in-process cache (seconds)
+    SECTIONS_CACHE_TTL = 6 * 60 * 60
+    
     def __init__(self):
         """Initialize the SEC client."""
         self.available = EDGAR_AVAILABLE
+        # (ticker, form_type) -> (fetched_at, sections)
+        self._sections_cache: Dict[Tuple[str, str], Tuple[float, List[FilingSection]]] = {}
         
         if not self.available:
             print("[SECApiClient] Warning: edgartools not available")
@@ -299,6 +306,34 @@ class SECApiClient:
             print(f"[SECApiClient] Error extracting sections for {ticker}: {e}")
             return self._get_demo_sections(ticker, form_type)
     
+    async def extract_key_sections_async(
+        self,
+        ticker: str,
+        form_type: str = "10-K"
+    ) -> List[FilingSection]:
+        """
+        Async variant of extract_key_sections with an in-process cache.
+        
+        edgartools is blocking, so the fetch runs in a worker thread and
+        can overlap with other I/O. Repeat requests for the same ticker and
+        form type are served from cache for SECTIONS_CACHE_TTL seconds.
+        
+        Args:
+            ticker: Stock ticker symbol
+            form_type: Form type (10-K or 10-Q)
+            
+        Returns:
+            List of FilingSection objects
+        """
+        key = (ticker.upper(), form_type)
+        cached = self._sections_cache.get(key)
+        if cached and time.time() - cached[0] < self.SECTIONS_CACHE_TTL:
+            return cached[1]
+        
+        sections = await asyncio.to_thread(self.extract_key_sections, ticker, form_type)
+        self._sections_cache[key] = (time.time(), sections)
+        return sections
+    
     def _get_demo_sections(self, ticker: str, form_type: str) -> List[FilingSection]:
         """Return demo sections for testing."""
         ticker = ticker.upper()
@@ -3,7 +3,8 @@
 # Stores embeddings of 10-K, 10-Q, earnings transcripts, and news articles
 
 import os
-from typing import List, Optional, Dict, Any
+import threading
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
 import chromadb
 from chromadb.config import Settings
@@ -12,6 +13,14 @@ from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 
 
+def _filing_timestamp(filing_date: Any) -> Optional[float]:
+    """Epoch seconds for a 'YYYY-MM-DD' filing date, or None if unparseable."""
+    try:
+        return datetime.strptime(str(filing_date)[:10], "%Y-%m-%d").timestamp()
+    except ValueError:
+        return None
+
+
 class VectorStore:
     """
     ChromaDB-based vector store for SmartStock AI.
@@ -24,6 +33,9 @@ class VectorStore:
     Enables semantic search across all document types.
     """
     
+    # Fields returned by search() unless the caller narrows them
+    DEFAULT_INCLUDE = ["documents", "metadatas", "distances"]
+    
     def __init__(
         self,
         persist_directory: str = "./data/chroma_db",
@@ -52,9 +64,14 @@ class VectorStore:
         )
         
         # Get or create the collection
+        # hnsw:search_ef trades a little recall for lower query latency
+        # (only applied when the collection is first created)
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"description": "SmartStock AI document embeddings"}
+            metadata={
+                "description": "SmartStock AI document embeddings",
+                "hnsw:search_ef": 50
+            }
         )
     
     def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
@@ -62,6 +79,15 @@ class VectorStore:
         embeddings = self.embedding_model.encode(texts, convert_to_numpy=True)
         return embeddings.tolist()
     
+    def embed_query(self, text: str):
+        """
+        Embed a single text as a unit-normalized NumPy vector.
+        
+        Uses the same model as the collection, so dot products between
+        results are cosine similarities.
+        """
+        return self.embedding_model.encode([text], convert_to_numpy=True, normalize_embeddings=True)[0]
+    
     def add_documents(
         self,
         documents: List[str],
@@ -82,6 +108,16 @@ class VectorStore:
         if ids is None:
             ids = [f"doc_{i}_{datetime.now().timestamp()}" for i in range(len(documents))]
         
+        # ChromaDB range operators only compare numbers, so keep a numeric
+        # copy of the filing date for date-window pre-filters (on copies of
+        # the caller's metadata dicts)
+        metadatas = [dict(meta) for meta in metadatas]
+        for meta in metadatas:
+            if "filing_date" in meta and "filing_ts" not in meta:
+                filing_ts = _filing_timestamp(meta["filing_date"])
+                if filing_ts is not None:
+                    meta["filing_ts"] = filing_ts
+        
         # Generate embeddings
         embeddings = self._generate_embeddings(documents)
         
@@ -100,7 +136,8 @@ class VectorStore:
         query: str,
         n_results: int = 5,
         where: Optional[Dict[str, Any]] = None,
-        where_document: Optional[Dict[str, Any]] = None
+        where_document: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Semantic search for relevant documents.
@@ -110,27 +147,51 @@ class VectorStore:
             n_results: Number of results to return
             where: Metadata filter (e.g., {"ticker": "AAPL"})
             where_document: Document content filter
+            include: Fields to return (default: documents, metadatas, distances).
+                     Embeddings are never requested.
             
         Returns:
             Dict with 'documents', 'metadatas', 'distances', 'ids'
+            (fields not included come back as empty lists)
         """
         # Generate query embedding
         query_embedding = self._generate_embeddings([query])[0]
         
-        # Search
+        return self.search_by_vector(
+            query_embedding,
+            n_results=n_results,
+            where=where,
+            where_document=where_document,
+            include=include
+        )
+    
+    def search_by_vector(
+        self,
+        query_embedding: Sequence[float],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Like search(), but with a precomputed query embedding.
+        
+        Lets callers that reuse the same query text cache its embedding
+        and skip the model call.
+        """
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=[list(query_embedding)],
             n_results=n_results,
             where=where,
             where_document=where_document,
-            include=["documents", "metadatas", "distances"]
+            include=include or self.DEFAULT_INCLUDE
         )
         
         return {
-            "documents": results["documents"][0] if results["documents"] else [],
-            "metadatas": results["metadatas"][0] if results["metadatas"] else [],
-            "distances": results["distances"][0] if results["distances"] else [],
-            "ids": results["ids"][0] if results["ids"] else []
+            "documents": results["documents"][0] if results.get("documents") else [],
+            "metadatas": results["metadatas"][0] if results.get("metadatas") else [],
+            "distances": results["distances"][0] if results.get("distances") else [],
+            "ids": results["ids"][0] if results.get("ids") else []
         }
     
     def search_by_ticker(
@@ -138,7 +199,9 @@ class VectorStore:
         query: str,
         ticker: str,
         filing_type: Optional[str] = None,
-        n_results: int = 5
+        n_results: int = 5,
+        include: Optional[List[str]] = None,
+        filed_between: Optional[Tuple[datetime, datetime]] = None
     ) -> Dict[str, Any]:
         """
         Search documents filtered by ticker and optionally filing type.
@@ -148,22 +211,57 @@ class VectorStore:
             ticker: Stock ticker to filter by
             filing_type: Optional filing type filter ('10-K', '10-Q', 'earnings_call', 'news')
             n_results: Number of results
+            include: Fields to return (see search())
+            filed_between: Optional (start, end) filing date window. Applied as
+                           a metadata pre-filter, so only chunks filed in the
+                           window are scored; chunks without a filing_ts
+                           (indexed before it was stored) are excluded.
             
         Returns:
             Search results with documents, metadata, and distances
         """
-        # ChromaDB requires $and for multiple conditions
+        where_filter = self._ticker_filter(ticker, filing_type, filed_between)
+        return self.search(query, n_results=n_results, where=where_filter, include=include)
+    
+    def search_by_embedding(
+        self,
+        query_embedding: Sequence[float],
+        ticker: str,
+        filing_type: Optional[str] = None,
+        n_results: int = 5,
+        include: Optional[List[str]] = None,
+        filed_between: Optional[Tuple[datetime, datetime]] = None
+    ) -> Dict[str, Any]:
+        """
+        Like search_by_ticker, but with a precomputed query embedding.
+        
+        Args:
+            query_embedding: Embedding of the query (same model as the collection)
+            ticker, filing_type, n_results, include, filed_between: See search_by_ticker()
+            
+        Returns:
+            Search results with documents, metadata, and distances
+        """
+        where_filter = self._ticker_filter(ticker, filing_type, filed_between)
+        return self.search_by_vector(query_embedding, n_results=n_results, where=where_filter, include=include)
+    
+    @staticmethod
+    def _ticker_filter(
+        ticker: str,
+        filing_type: Optional[str] = None,
+        filed_between: Optional[Tuple[datetime, datetime]] = None
+    ) -> Dict[str, Any]:
+        """Build the where clause for a ticker-scoped search."""
+        conditions = [{"ticker": {"$eq": ticker.upper()}}]
         if filing_type:
-            where_filter = {
-                "$and": [
-                    {"ticker": {"$eq": ticker.upper()}},
-                    {"filing_type": {"$eq": filing_type}}
-                ]
-            }
-        else:
-            where_filter = {"ticker": {"$eq": ticker.upper()}}
+            conditions.append({"filing_type": {"$eq": filing_type}})
+        if filed_between:
+            start, end = filed_between
+            conditions.append({"filing_ts": {"$gte": start.timestamp()}})
+            conditions.append({"filing_ts": {"$lte": end.timestamp()}})
         
-        return self.search(query, n_results=n_results, where=where_filter)
+        # ChromaDB requires $and for multiple conditions
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
     
     def get_recent_news(
         self,
@@ -251,12 +349,31 @@ class VectorStore:
 
 # Singleton instance
 _vector_store: Optional[VectorStore] = None
+_vector_store_lock = threading.Lock()
 
 
 def get_vector_store() -> VectorStore:
     """Get or create the singleton VectorStore instance."""
     global _vector_store
     if _vector_store is None:
-        _vector_store = VectorStore()
+        # The warmup thread and request threads may race here; the model
+        # and Chroma client must only be built once
+        with _vector_store_lock:
+            if _vector_store is None:
+                _vector_store = VectorStore()
     return _vector_store
 
+
+
+def warm() -> None:
+    """
+    Warm the embedding model and HNSW index with a throwaway query.
+    
+    The first search after process start pays a cold-start penalty (model
+    load, index pages read from disk). Running this once at startup moves
+    that cost off the first user-visible request.
+    """
+    try:
+        get_vector_store().search_by_ticker(query="warmup", ticker="AAPL", n_results=1)
+    except Exception as e:
+        print(f"[VectorStore] Warmup failed: {e}")
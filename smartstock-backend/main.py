@@ -3,6 +3,8 @@
 # Agentic RAG API powered by LangGraph with Hybrid Storage
 
 import os
+import logging
+import threading
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,11 +16,12 @@ from dotenv import load_dotenv
 
 from models import AgentResponse, QueryRequest
 from agent.graph import run_agent
-from data.vector_store import get_vector_store
+from data.vector_store import get_vector_store, warm
 from data.metrics_store import get_metrics_store
 from data.ticker_mapping import get_ticker_mapper
 from data.db_connection import init_connection_pool, close_connection_pool
 from data.news_store import get_news_store
+from data.financial_api import init_http_session, close_http_session
 from jobs.news_archival import archive_old_news
 from jobs.price_archival import archive_old_prices, should_run_price_archival
 from utils.errors import (
@@ -40,6 +43,12 @@ from utils.error_handler import (
 # Load environment variables
 load_dotenv()
 
+# Application logging; tools log under the "smartstock.*" hierarchy (DEBUG is off by default)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
+)
+
 # Initialize scheduler
 scheduler = BackgroundScheduler()
 
@@ -57,6 +66,9 @@ async def lifespan(app: FastAPI):
     init_connection_pool()
     print("[SmartStock AI] PostgreSQL connection pool initialized")
     
+    # Keep-alive HTTP session for FMP/Finnhub requests made on this loop
+    await init_http_session()
+    
     # Initialize metrics store with demo data
     metrics_store = get_metrics_store()
     metrics_store.seed_demo_data()
@@ -70,8 +82,14 @@ async def lifespan(app: FastAPI):
     ticker_mapper = get_ticker_mapper()
     print(f"[SmartStock AI] Ticker Mapper ready: {ticker_mapper.get_stats()}")
     
-    # Vector store initialized lazily on first use
-    print("[SmartStock AI] Vector Store will initialize on first use")
+    # Vector store initialized lazily on first use; with SMARTSTOCK_WARM=1 the
+    # model and HNSW index are loaded in the background so the first query
+    # doesn't pay the cold start
+    if os.getenv("SMARTSTOCK_WARM") == "1":
+        threading.Thread(target=warm, daemon=True).start()
+        print("[SmartStock AI] Vector Store warming in background")
+    else:
+        print("[SmartStock AI] Vector Store will initialize on first use")
     
     # Start scheduler for news archival
     retention_days = int(os.getenv("NEWS_RETENTION_DAYS", "30"))
@@ -122,6 +140,7 @@ async def lifespan(app: FastAPI):
     print("[SmartStock AI] Shutting down...")
     scheduler.shutdown()
     close_connection_pool()
+    await close_http_session()
     print("[SmartStock AI] Shutdown complete")
 
 
@@ -0,0 +1,26 @@
+-- Migration: Add published_day day bin and ±24hr window index to news_articles
+-- Date: 2026-10-17
+-- Description: Integer day bin (UTC epoch days) for segment-style range pruning.
+-- A ±24hr window maps to <=3 contiguous bins, and published_at only has to trim
+-- the boundary bins. Adding a STORED generated column rewrites the table, so run
+-- this once during a maintenance window rather than on application startup.
+
+BEGIN;
+
+-- Generated day bin; must match data.news_store.epoch_day
+ALTER TABLE news_articles
+ADD COLUMN IF NOT EXISTS published_day INTEGER
+GENERATED ALWAYS AS (floor(EXTRACT(EPOCH FROM published_at) / 86400)::int) STORED;
+
+-- INCLUDE (id) lets the id-first window probes run as index-only scans
+CREATE INDEX IF NOT EXISTS idx_news_ticker_day_id
+ON news_articles(ticker, published_day, published_at) INCLUDE (id);
+
+COMMIT;
+
+ANALYZE news_articles;
+
+-- Verification queries (run after migration):
+-- SELECT column_name, generation_expression FROM information_schema.columns
+--   WHERE table_name = 'news_articles' AND column_name = 'published_day';
+-- SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_news_ticker_day_id';
@@ -3,7 +3,6 @@
 # Hybrid Retrieval: SQLite (structured metrics) + ChromaDB (RAG context) + Gemini synthesis
 
 import os
-import asyncio
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
@@ -14,7 +13,7 @@ from dotenv import load_dotenv
 from agent.state import ToolResult, Metric, Citation
 from data.vector_store import get_vector_store
 from data.metrics_store import get_metrics_store
-from data.financial_api import get_financial_fetcher
+from data.financial_api import get_financial_fetcher, run_fetch
 from data.financial_statements_store import get_financial_statements_store
 from data.db_connection import get_connection
 
@@ -369,8 +368,7 @@ def compare_financial_data(
             if has_suspicious_data or not any("revenue_growth" in k.lower() for k in structured_data[ticker].keys()) or data_is_stale:
                 print(f"[Comparison Tool] Fetching fresh metrics from API for {ticker}...")
                 try:
-                    import asyncio
-                    fresh_metrics = asyncio.run(financial_fetcher.get_key_metrics(ticker, quarters=4))
+                    fresh_metrics = run_fetch(financial_fetcher.get_key_metrics(ticker, quarters=4))
                     for fm in fresh_metrics:
                         metric_name = fm.metric_name
                         should_include = (
@@ -398,7 +396,7 @@ def compare_financial_data(
             print(f"[Comparison Tool] MetricsStore error for {ticker}: {e}")
             # Try fetching fresh from API as fallback
             try:
-                fresh_metrics = asyncio.run(financial_fetcher.get_key_metrics(ticker, quarters=4))
+                fresh_metrics = run_fetch(financial_fetcher.get_key_metrics(ticker, quarters=4))
                 for fm in fresh_metrics:
                     metric_name = fm.metric_name
                     should_include = (
@@ -423,7 +421,7 @@ def compare_financial_data(
         # 2. Fetch current price (always get fresh from API or latest from stock_prices)
         try:
             # Try to get fresh quote from API
-            quote = asyncio.run(financial_fetcher.get_quote(ticker))
+            quote = run_fetch(financial_fetcher.get_quote(ticker))
             if quote and quote.get("price"):
                 structured_data[ticker]["current_price"] = {
                     "value": float(quote["price"]),
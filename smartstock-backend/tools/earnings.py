@@ -3,12 +3,31 @@
 # Live RAG retrieval from ChromaDB + Gemini synthesis
 
 import os
-from typing import Literal
-from pydantic import BaseModel, Field
+import re
+import math
+import asyncio
+import logging
+import threading
+import importlib.util
+from collections import Counter
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Literal, Tuple
+import httpx
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 from langchain_core.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
+# orjson for the JSON recovery path (falls back to stdlib json)
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    import json
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
 from agent.state import ToolResult, Metric, Citation
 from data.vector_store import get_vector_store
 from data.sec_api import get_sec_client
@@ -17,9 +36,13 @@ from data.financial_statements_store import get_financial_statements_store
 
 load_dotenv()
 
+logger = logging.getLogger("smartstock.tools.earnings")
+
 
 class EarningsSummaryInput(BaseModel):
     """Input schema for the Earnings Synthesizer tool."""
+    model_config = ConfigDict(str_strip_whitespace=True, frozen=True)
+    
     ticker: str = Field(
         description="Stock ticker symbol (e.g., 'AAPL', 'GOOGL', 'MSFT')"
     )
@@ -33,18 +56,13 @@ class EarningsSummaryInput(BaseModel):
 
 
 # Synthesis prompt for Gemini
-SYNTHESIS_PROMPT = """You are a financial analyst AI. Based on the following SEC filing excerpts, 
+# Static instructions come first and never change between calls, so Gemini's
+# implicit prefix caching can discount them; per-call values are appended after.
+_SYNTHESIS_PREFIX = """You are a financial analyst AI. Based on the SEC filing excerpts below, 
 provide a concise synthesis of key insights, risks, and metrics.
 
-Company: {ticker}
-Filing Type: {filing_type}
-Quarter: {quarter}
-
-Retrieved Document Excerpts:
-{context}
-
 **CRITICAL - NO HALLUCINATIONS:**
-- ONLY use information from the "Retrieved Document Excerpts" above
+- ONLY use information from the "Retrieved Document Excerpts" below
 - If information is missing or not found in the excerpts, explicitly state "I don't have data on [topic]"
 - DO NOT make up, estimate, or infer missing values
 - DO NOT use general knowledge about the company
@@ -55,86 +73,215 @@ Instructions:
 2. Include inline citations like [1], [2] referencing the source documents
 3. Extract 3-4 key metrics with their values - ONLY if they appear in the excerpts
 4. Identify the main risks or concerns mentioned - ONLY if they appear in the excerpts
-
-Respond in this exact JSON format:
-{{
-    "synthesis": "Your 2-3 sentence synthesis with [1], [2] citations...",
-    "metrics": [
-        {{"key": "Metric Name", "value": "Value", "color": "green/red/blue/yellow"}},
-        ...
-    ],
-    "risks": ["Risk 1", "Risk 2"]
-}}
 """
 
 
-@tool(args_schema=EarningsSummaryInput)
-def get_earnings_summary(ticker: str, filing_type: str, quarter: str = "latest") -> ToolResult:
-    """
-    Summarize key risks and insights from earnings calls or SEC filings.
+def build_synthesis_prompt(ticker: str, filing_type: str, quarter: str, context: str) -> str:
+    """Append the per-call company details and excerpts to the static prompt prefix."""
+    return (
+        _SYNTHESIS_PREFIX
+        + f"\nCompany: {ticker}\nFiling Type: {filing_type}\nQuarter: {quarter}\n\n"
+        + "Retrieved Document Excerpts:\n"
+        + context
+    )
+
+
+# Metric value formatters keyed by metric_unit
+_METRIC_FORMATTERS = {
+    "USD": lambda v, u: f"${v:,.2f}",
+    "x": lambda v, u: f"{v:,.2f}x",
+    "%": lambda v, u: f"{v:+.2f}%",
+}
+
+
+def _format_metric_default(v: float, u: str) -> str:
+    """Formatter for units without an entry in _METRIC_FORMATTERS."""
+    return f"{v:,.2f} {u}"
+
+
+# Metric name fragments for which a positive value is good news
+_POSITIVE_METRIC_MARKERS = ("growth", "margin")
+
+
+# Sentence / token splitting for salient-excerpt selection
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Inline citation markers like [1], [2] in the synthesis text
+_CITE_RE = re.compile(r"\[(\d+)\]")
+
+
+def _bm25_scores(corpus: List[List[str]], query_terms: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of each tokenized sentence in corpus against the query terms."""
+    n = len(corpus)
+    avgdl = sum(len(d) for d in corpus) / n or 1.0
+    df = Counter(t for d in corpus for t in set(d))
+    idf = {t: math.log((n - df[t] + 0.5) / (df[t] + 0.5) + 1) for t in set(query_terms)}
     
-    This tool performs LIVE RAG retrieval:
-    1. Queries ChromaDB for relevant filing sections
-    2. Falls back to SEC EDGAR via edgartools if needed
-    3. Synthesizes with Gemini 2.5
+    scores = []
+    for d in corpus:
+        tf = Counter(d)
+        norm = k1 * (1 - b + b * len(d) / avgdl)
+        scores.append(sum(w * tf[t] * (k1 + 1) / (tf[t] + norm) for t, w in idf.items() if t in tf))
+    return scores
+
+
+def salient_excerpt(doc: str, query: str, top_k: int = 3, max_chars: int = 500) -> str:
+    """
+    Reduce a document chunk to its sentences most relevant to the query.
     
-    Args:
-        ticker: Stock ticker symbol
-        filing_type: Type of filing ('10-Q', '10-K', or 'earnings_call')
-        quarter: Specific quarter or 'latest'
+    Sentences are ranked with BM25 against the query and the top_k are
+    joined back in document order, so Gemini sees high-signal text instead
+    of the boilerplate that usually opens a filing section.
+    """
+    sentences = [s for s in _SENTENCE_SPLIT_RE.split(doc[:6000]) if s.strip()]
+    if len(sentences) > top_k:
+        corpus = [_TOKEN_RE.findall(s.lower()) for s in sentences]
+        scores = _bm25_scores(corpus, _TOKEN_RE.findall(query.lower()))
+        top = sorted(sorted(range(len(sentences)), key=scores.__getitem__, reverse=True)[:top_k])
+        sentences = [sentences[i] for i in top]
+    return " ".join(sentences)[:max_chars]
+
+
+class MetricOut(BaseModel):
+    """A key metric extracted by Gemini from the filing excerpts."""
+    key: str = Field(description="Metric name")
+    value: str = Field(description="Metric value as stated in the excerpts")
+    color: Literal["green", "red", "blue", "yellow"] = Field(
+        default="blue",
+        description="Display color: green (positive), red (negative), blue (neutral), yellow (caution)"
+    )
+
+
+class EarningsSynth(BaseModel):
+    """Structured synthesis returned by Gemini's JSON mode."""
+    synthesis: str = Field(description="2-3 sentence synthesis with [1], [2] citations")
+    metrics: List[MetricOut] = Field(default_factory=list, description="3-4 key metrics from the excerpts")
+    risks: List[str] = Field(default_factory=list, description="Main risks or concerns mentioned")
+
+
+# In-flight requests keyed by (ticker, filing_type, quarter). Concurrent callers
+# for the same key wait on the first caller's future instead of repeating the
+# ChromaDB + Gemini pipeline.
+_INFLIGHT: Dict[Tuple[str, str, str], Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+_INFLIGHT_WAIT_TIMEOUT = 120  # seconds; waiters run their own pipeline after this
+
+
+# Singleton structured-output LLM (JSON mode bound to EarningsSynth)
+_structured_llm = None
+
+
+def _gemini_client_args() -> Dict[str, Any]:
+    """
+    httpx settings for the google-genai client behind ChatGoogleGenerativeAI.
     
-    Returns:
-        ToolResult with synthesis, metrics, and citations
+    Keeps TLS connections alive between calls and uses HTTP/2 multiplexing
+    when the optional h2 package is installed (httpx requires it for http2).
     """
-    ticker = ticker.upper()
-    print(f"[Earnings Tool] Analyzing {ticker} {filing_type} ({quarter})")
+    return {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+    }
+
+
+def _get_llm() -> ChatGoogleGenerativeAI:
+    """Create the Gemini chat model used for earnings synthesis."""
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        google_api_key=os.getenv("GOOGLE_API_KEY"),
+        temperature=0.3,
+        client_args=_gemini_client_args()
+    )
+
+
+def _get_structured_llm():
+    """
+    Get or create the Gemini runnable bound to the EarningsSynth schema.
     
-    # Step 1: Try to retrieve from ChromaDB (indexed data)
+    Uses Gemini's native JSON mode (response_mime_type="application/json" with
+    a response schema), so the response is parsed straight into EarningsSynth.
+    The raw message is kept alongside so a failed parse can be recovered.
+    """
+    global _structured_llm
+    if _structured_llm is None:
+        _structured_llm = _get_llm().with_structured_output(
+            EarningsSynth, method="json_schema", include_raw=True
+        )
+    return _structured_llm
+
+
+def _parse_synthesis_fallback(text: str) -> EarningsSynth:
+    """Recover an EarningsSynth from raw model text when structured parsing failed."""
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            return EarningsSynth.model_validate(_json_loads(text[start:end + 1]))
+        except (_JSONDecodeError, ValidationError):
+            pass
+    return EarningsSynth(synthesis=text)  # Use raw synthesis
+
+
+def _search_indexed_context(ticker: str, filing_type: str) -> Tuple[List[str], List[Citation]]:
+    """Step 1: Retrieve relevant filing excerpts from ChromaDB (indexed data)."""
     vector_store = get_vector_store()
     context_docs = []
     citations = []
+    query = f"{ticker} {filing_type} risks revenue growth management discussion"
     
     try:
-        # Search for relevant documents
+        # Full chunks, not the stored previews: salient_excerpt ranks sentences
+        # across the chunk, and the preview is mostly the section's opening text
         results = vector_store.search_by_ticker(
-            query=f"{ticker} {filing_type} risks revenue growth management discussion",
+            query=query,
             ticker=ticker,
             filing_type=filing_type if filing_type != "earnings_call" else None,
-            n_results=5
+            n_results=5,
+            include=["documents", "metadatas", "distances"]
         )
         
         if results["documents"]:
-            print(f"[Earnings Tool] Found {len(results['documents'])} chunks in ChromaDB")
+            logger.debug("Found %d chunks in ChromaDB", len(results["documents"]))
             for i, (doc, meta) in enumerate(zip(results["documents"], results["metadatas"])):
-                context_docs.append(f"[{i+1}] {doc[:2000]}...")
+                context_docs.append(f"[{i+1}] {salient_excerpt(doc, query)}...")
                 citations.append(Citation(
                     id=i+1,
                     source_type=meta.get("filing_type", filing_type),
                     source_detail=f"{ticker} {meta.get('section_name', 'Filing')}, {meta.get('filing_date', 'Recent')}"
                 ))
     except Exception as e:
-        print(f"[Earnings Tool] ChromaDB search failed: {e}")
+        logger.warning("ChromaDB search failed: %s", e)
     
-    # Step 2: If no indexed data, fetch from SEC EDGAR
-    if not context_docs:
-        print("[Earnings Tool] No indexed data, fetching from SEC EDGAR...")
-        sec_client = get_sec_client()
+    return context_docs, citations
+
+
+async def _fetch_sec_context(ticker: str, filing_type: str) -> Tuple[List[str], List[Citation]]:
+    """Step 2: Fetch key sections from SEC EDGAR when nothing is indexed."""
+    logger.info("No indexed data for %s, fetching from SEC EDGAR", ticker)
+    sec_client = get_sec_client()
+    context_docs = []
+    citations = []
+    
+    try:
+        form_type = "10-K" if filing_type == "10-K" else "10-Q"
+        sections = await sec_client.extract_key_sections_async(ticker, form_type)
         
-        try:
-            form_type = "10-K" if filing_type == "10-K" else "10-Q"
-            sections = sec_client.extract_key_sections(ticker, form_type)
-            
-            for i, section in enumerate(sections[:5]):
-                context_docs.append(f"[{i+1}] {section.section_name}: {section.content[:2000]}...")
-                citations.append(Citation(
-                    id=i+1,
-                    source_type=section.form_type,
-                    source_detail=f"{ticker} {section.section_name}, {section.filing_date}"
-                ))
-        except Exception as e:
-            print(f"[Earnings Tool] SEC EDGAR fetch failed: {e}")
+        for i, section in enumerate(sections[:5]):
+            excerpt = salient_excerpt(section.content, f"{ticker} {filing_type} {section.section_name} risks revenue growth")
+            context_docs.append(f"[{i+1}] {section.section_name}: {excerpt}...")
+            citations.append(Citation(
+                id=i+1,
+                source_type=section.form_type,
+                source_detail=f"{ticker} {section.section_name}, {section.filing_date}"
+            ))
+    except Exception as e:
+        logger.warning("SEC EDGAR fetch failed: %s", e)
     
-    # Step 3: Get metrics from database
+    return context_docs, citations
+
+
+def _fetch_db_metrics(ticker: str) -> List[Metric]:
+    """Step 3: Get formatted metrics (and DCF upside) from the database."""
     metrics_store = get_metrics_store()
     statements_store = get_financial_statements_store()
     metrics = []
@@ -145,12 +292,11 @@ def get_earnings_summary(ticker: str, filing_type: str, quarter: str = "latest")
         for m in db_metrics[:6]:
             val = m["metric_value"]
             unit = m["metric_unit"] or ""
-            formatted_val = f"${val:,.2f}" if unit == "USD" else f"{val:,.2f} {unit}"
-            if unit == "x": formatted_val = f"{val:,.2f}x"
-            if unit == "%": formatted_val = f"{val:+.2f}%"
+            formatted_val = _METRIC_FORMATTERS.get(unit, _format_metric_default)(val, unit)
             
-            color = "green" if ("growth" in m["metric_name"].lower() or "margin" in m["metric_name"].lower()) and val > 0 else \
-                    "red" if val < 0 else "blue"
+            name_lower = m["metric_name"].lower()
+            is_positive_metric = any(k in name_lower for k in _POSITIVE_METRIC_MARKERS)
+            color = "green" if is_positive_metric and val > 0 else "red" if val < 0 else "blue"
             
             metrics.append(Metric(
                 key=m["metric_name"].replace("_", " ").title(),
@@ -167,20 +313,92 @@ def get_earnings_summary(ticker: str, filing_type: str, quarter: str = "latest")
                 color_context="green" if dcf['upside_percent'] > 0 else "red"
             ))
     except Exception as e:
-        print(f"[Earnings Tool] Metrics fetch failed: {e}")
+        logger.warning("Metrics fetch failed: %s", e)
+    
+    return metrics
+
+
+async def _gather_sources(ticker: str, filing_type: str) -> Tuple[List[str], List[Citation], List[Metric]]:
+    """
+    Collect filing context and metrics concurrently.
+    
+    The metrics lookup runs in the background while ChromaDB is searched,
+    so a slow SEC EDGAR fallback overlaps with database I/O instead of
+    running after it.
+    """
+    metrics_task = asyncio.create_task(asyncio.to_thread(_fetch_db_metrics, ticker))
+    
+    context_docs, citations = await asyncio.to_thread(_search_indexed_context, ticker, filing_type)
+    if not context_docs:
+        context_docs, citations = await _fetch_sec_context(ticker, filing_type)
+    
+    metrics = await metrics_task
+    return context_docs, citations, metrics
+
+
+@tool(args_schema=EarningsSummaryInput)
+def get_earnings_summary(ticker: str, filing_type: str, quarter: str = "latest") -> ToolResult:
+    """
+    Summarize key risks and insights from earnings calls or SEC filings.
+    
+    This tool performs LIVE RAG retrieval:
+    1. Queries ChromaDB for relevant filing sections
+    2. Falls back to SEC EDGAR via edgartools if needed
+    3. Synthesizes with Gemini 2.5
+    
+    Args:
+        ticker: Stock ticker symbol
+        filing_type: Type of filing ('10-Q', '10-K', or 'earnings_call')
+        quarter: Specific quarter or 'latest'
+    
+    Returns:
+        ToolResult with synthesis, metrics, and citations
+    """
+    ticker = ticker.upper()
+    key = (ticker, filing_type, quarter)
+    
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _INFLIGHT[key] = future
+    
+    if not is_owner:
+        logger.debug("Joining in-flight request for %s %s (%s)", ticker, filing_type, quarter)
+        try:
+            return future.result(timeout=_INFLIGHT_WAIT_TIMEOUT)
+        except FutureTimeoutError:
+            return _run_earnings_summary(ticker, filing_type, quarter)
+    
+    try:
+        result = _run_earnings_summary(ticker, filing_type, quarter)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+
+def _run_earnings_summary(ticker: str, filing_type: str, quarter: str) -> ToolResult:
+    """Run the retrieval + synthesis pipeline behind get_earnings_summary."""
+    logger.info("Analyzing %s %s (%s)", ticker, filing_type, quarter)
+    
+    # Steps 1-3: ChromaDB search (with SEC EDGAR fallback) overlapped with the metrics lookup
+    context_docs, citations, metrics = asyncio.run(_gather_sources(ticker, filing_type))
     
     # Step 4: Synthesize with Gemini
     synthesis_text = ""
+    risks: List[str] = []
     
     if context_docs:
         try:
-            llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                google_api_key=os.getenv("GOOGLE_API_KEY"),
-                temperature=0.3
-            )
+            llm = _get_structured_llm()
             
-            prompt = SYNTHESIS_PROMPT.format(
+            prompt = build_synthesis_prompt(
                 ticker=ticker,
                 filing_type=filing_type,
                 quarter=quarter,
@@ -188,28 +406,22 @@ def get_earnings_summary(ticker: str, filing_type: str, quarter: str = "latest")
             )
             
             response = llm.invoke(prompt)
-            synthesis_text = response.content
+            parsed: EarningsSynth = response["parsed"]
+            if parsed is None:
+                logger.debug("Structured parse failed (%s), recovering from raw text", response["parsing_error"])
+                parsed = _parse_synthesis_fallback(response["raw"].content)
+            synthesis_text = parsed.synthesis
+            risks = parsed.risks
             
-            # Try to parse JSON response for metrics
-            import json
-            try:
-                if "{" in synthesis_text:
-                    json_str = synthesis_text[synthesis_text.find("{"):synthesis_text.rfind("}")+1]
-                    parsed = json.loads(json_str)
-                    synthesis_text = parsed.get("synthesis", synthesis_text)
-                    
-                    # Add parsed metrics
-                    for m in parsed.get("metrics", []):
-                        metrics.append(Metric(
-                            key=m.get("key", ""),
-                            value=m.get("value", ""),
-                            color_context=m.get("color", "blue")
-                        ))
-            except json.JSONDecodeError:
-                pass  # Use raw synthesis
+            for m in parsed.metrics:
+                metrics.append(Metric(
+                    key=m.key,
+                    value=m.value,
+                    color_context=m.color
+                ))
                 
         except Exception as e:
-            print(f"[Earnings Tool] Gemini synthesis failed: {e}")
+            logger.warning("Gemini synthesis failed: %s", e)
             synthesis_text = f"Analysis of {ticker}'s {filing_type}: Unable to generate synthesis. Error: {str(e)}"
     else:
         synthesis_text = f"""I don't have sufficient data to provide an analysis for {ticker}'s {filing_type}.
@@ -233,6 +445,11 @@ def get_earnings_summary(ticker: str, filing_type: str, quarter: str = "latest")
             Metric(key="Filing Type", value=filing_type, color_context="blue"),
         ]
     
+    # Drop citations the synthesis never references (keep all if it cites none)
+    cited_ids = {int(m.group(1)) for m in _CITE_RE.finditer(synthesis_text)}
+    if cited_ids:
+        citations = [c for c in citations if c.id in cited_ids]
+    
     if not citations:
         citations = [
             Citation(id=1, source_type="System", source_detail=f"No indexed data for {ticker}")
@@ -244,5 +461,6 @@ def get_earnings_summary(ticker: str, filing_type: str, quarter: str = "latest")
         synthesis_text=synthesis_text,
         metrics=metrics[:5],  # Limit to 5 metrics
         citations=citations[:5],  # Limit to 5 citations
-        raw_data={"ticker": ticker, "filing_type": filing_type, "quarter": quarter, "sources": len(context_docs)}
+        raw_data={"ticker": ticker, "filing_type": filing_type, "quarter": quarter, "sources": len(context_docs), "risks": risks,
+                  "cited_ids": sorted(cited_ids)}
     )